@@ -1,15 +1,20 @@
+import io
+import random
 import unittest
-from data_structures import Graph, PriorityQueue
+from contextlib import redirect_stdout
+from data_structures import Graph, PriorityQueue, FibonacciHeap, BinomialHeap, RedBlackTree, RedBlackTreeStore, BTree
 
 class TestGraph(unittest.TestCase):
     def setUp(self):
         self.graph = Graph()
 
     def test_add_vertex(self):
-        self.graph.add_vertex(1)
-        self.assertIn(1, self.graph.vertices)
-        self.graph.add_vertex(2)
-        self.assertIn(2, self.graph.vertices)
+        for vertex in (1, 2):
+            with self.subTest(vertex=vertex):
+                self.graph.add_vertex(vertex)
+                self.assertIn(vertex, self.graph.vertices)
+        with self.assertRaises(TypeError):
+            self.graph.add_vertex([3])
 
     def test_remove_vertex(self):
         self.graph.add_vertex(1)
@@ -20,6 +25,33 @@ class TestGraph(unittest.TestCase):
         self.assertIn(1, self.graph.vertices)
         self.assertIn(3, self.graph.vertices)
 
+    def test_remove_vertex_edges(self):
+        for vertex in (1, 2, 3):
+            self.graph.add_vertex(vertex)
+        self.graph.add_edges([(1, 2), (2, 3), (3, 1)])
+        self.graph.remove_vertex(2)
+        self.assertNotIn(2, self.graph.outbound_edges[1])
+        self.assertNotIn(2, self.graph.inbound_edges[3])
+        self.assertTrue(self.graph.is_adjacent(3, 1))
+        with self.assertRaises(ValueError):
+            self.graph.remove_vertex(2)
+
+    def test_remove_vertices(self):
+        for weighted in (True, False):
+            graph = Graph(weighted=weighted)
+            for vertex in range(5):
+                graph.add_vertex(vertex)
+            graph.add_edges([(0, 1), (1, 2), (2, 0), (3, 0), (0, 4), (4, 3)])
+            graph.remove_vertices([1, 3])
+            self.assertEqual(graph.vertices, {0, 2, 4})
+            self.assertEqual(set(graph.outbound_edges[0]), {4})
+            self.assertEqual(graph.inbound_edges[0], {2})
+            self.assertEqual(graph.inbound_edges[2], set())
+            self.assertEqual(set(graph.outbound_edges[4]), set())
+            with self.assertRaises(ValueError):
+                graph.remove_vertices([0, 1])
+            self.assertIn(0, graph.vertices)
+
     def test_add_edge(self):
         self.graph.add_vertex(1)
         self.graph.add_vertex(2)
@@ -27,6 +59,33 @@ class TestGraph(unittest.TestCase):
         self.assertIn(2, self.graph.outbound_edges[1])
         self.assertIn(1, self.graph.inbound_edges[2])
 
+    def test_add_edges(self):
+        for vertex in (1, 2, 3):
+            self.graph.add_vertex(vertex)
+        self.graph.add_edges([(1, 2), (1, 3), (3, 2)])
+        self.assertIn(2, self.graph.outbound_edges[1])
+        self.assertIn(3, self.graph.outbound_edges[1])
+        self.assertIn(1, self.graph.inbound_edges[2])
+        self.assertIn(3, self.graph.inbound_edges[2])
+        with self.assertRaises(ValueError):
+            self.graph.add_edges([(2, 1), (2, 4)])
+        self.assertFalse(self.graph.is_adjacent(2, 1))
+
+    def test_unweighted_graph(self):
+        graph = Graph(weighted=False)
+        for vertex in (1, 2, 3):
+            graph.add_vertex(vertex)
+        graph.add_edge(1, 2)
+        graph.add_edges([(1, 3), (3, 2)])
+        self.assertEqual(graph.outbound_edges[1], {2, 3})
+        self.assertTrue(graph.is_adjacent(3, 2))
+        graph.remove_edge(1, 2)
+        self.assertFalse(graph.is_adjacent(1, 2))
+        with self.assertRaises(ValueError):
+            graph.set_edge_value(1, 3, 5)
+        with self.assertRaises(ValueError):
+            graph.get_edge_value(1, 3)
+
     def test_remove_edge(self):
         self.graph.add_vertex(1)
         self.graph.add_vertex(2)
@@ -34,6 +93,22 @@ class TestGraph(unittest.TestCase):
         self.graph.remove_edge(1, 2)
         self.assertNotIn(2, self.graph.outbound_edges[1])
         self.assertNotIn(1, self.graph.inbound_edges[2])
+        with self.assertRaises(ValueError):
+            self.graph.remove_edge(1, 2)
+        with self.assertRaises(ValueError):
+            self.graph.remove_edge(2, 1)
+
+    def test_edge_value(self):
+        self.graph.add_vertex(1)
+        self.graph.add_vertex(2)
+        self.graph.add_edge(1, 2)
+        self.graph.set_edge_value(1, 2, 7)
+        self.assertEqual(self.graph.get_edge_value(1, 2), 7)
+        with self.assertRaises(ValueError):
+            self.graph.get_edge_value(2, 1)
+        with self.assertRaises(ValueError):
+            self.graph.set_edge_value(2, 1, 7)
+        self.assertNotIn(1, self.graph.outbound_edges.get(2, ()))
 
     def test_is_adjacent(self):
         self.graph.add_vertex(1)
@@ -43,29 +118,74 @@ class TestGraph(unittest.TestCase):
         self.assertFalse(self.graph.is_adjacent(2, 1))
         self.assertFalse(self.graph.is_adjacent(1, 3))
 
+    def test_iter_successors_and_predecessors(self):
+        for vertex in (1, 2, 3):
+            self.graph.add_vertex(vertex)
+        self.graph.add_edges([(1, 2), (1, 3), (3, 2)])
+        self.graph.set_edge_value(1, 3, "a")
+        self.assertEqual(dict(self.graph.iter_successors(1)), {2: None, 3: "a"})
+        self.assertEqual(list(self.graph.iter_successors(2)), [])
+        self.assertEqual(dict(self.graph.iter_predecessors(3)), {1: "a"})
+        self.assertEqual(dict(self.graph.iter_predecessors(2)), {1: None, 3: None})
+        with self.assertRaises(ValueError):
+            self.graph.iter_successors(4)
+
+        graph = Graph(weighted=False)
+        for vertex in (1, 2):
+            graph.add_vertex(vertex)
+        graph.add_edge(1, 2)
+        self.assertEqual(list(graph.iter_successors(1)), [(2, None)])
+        self.assertEqual(list(graph.iter_predecessors(2)), [(1, None)])
+
+    def test_finalize(self):
+        for vertex in ("a", "b", "c", "d"):
+            self.graph.add_vertex(vertex)
+        self.graph.add_edges([("a", "b"), ("a", "c"), ("c", "d")])
+        self.graph.set_edge_value("a", "c", 5)
+        ids = self.graph.finalize()
+        self.assertEqual(ids, {"a": 0, "b": 1, "c": 2, "d": 3})
+        self.assertEqual(sorted(self.graph.neighbors(0)), [1, 2])
+        self.assertEqual(list(self.graph.neighbors(1)), [])
+        self.assertEqual(list(self.graph.neighbors(2)), [3])
+        self.assertEqual(dict(zip(self.graph.neighbors(0),
+            self.graph.neighbor_values(0))), {1: None, 2: 5})
+
+        self.graph.add_edge("b", "d")
+        with self.assertRaises(ValueError):
+            self.graph.neighbors(1)
+        self.graph.finalize()
+        self.assertEqual(list(self.graph.neighbors(1)), [3])
+
+    def test_bitset(self):
+        for vertex in range(10):
+            self.graph.add_vertex(vertex)
+        visited = self.graph.new_bitset()
+        frontier = self.graph.new_bitset()
+        Graph.set_bit(visited, 9)
+        Graph.set_bit(frontier, 9)
+        self.assertTrue(Graph.get_bit(visited, 9))
+        self.assertFalse(Graph.get_bit(visited, 8))
+        self.assertFalse(Graph.any_unvisited(frontier, visited))
+        Graph.set_bit(frontier, 3)
+        self.assertTrue(Graph.any_unvisited(frontier, visited))
+
 class TestPriorityQueue(unittest.TestCase):
+    def setUp(self):
+        self.pq = PriorityQueue()
+        self.pq.insert(1, "high priority")
+        self.pq.insert(2, "medium priority")
+        self.pq.insert(3, "low priority")
+
     def test_insert(self):
-        pq = PriorityQueue()
-        pq.insert(1, "high priority")
-        pq.insert(2, "medium priority")
-        pq.insert(3, "low priority")
-        self.assertEqual(len(pq), 3)
+        self.assertEqual(len(self.pq), 3)
 
     def test_extract_minimum(self):
-        pq = PriorityQueue()
-        pq.insert(1, "high priority")
-        pq.insert(2, "medium priority")
-        pq.insert(3, "low priority")
-        self.assertEqual(pq.extract_minimum(), "high priority")
-        self.assertEqual(len(pq), 2)
+        self.assertEqual(self.pq.extract_minimum(), "high priority")
+        self.assertEqual(len(self.pq), 2)
 
     def test_minimum(self):
-        pq = PriorityQueue()
-        pq.insert(1, "high priority")
-        pq.insert(2, "medium priority")
-        pq.insert(3, "low priority")
-        self.assertEqual(pq.minimum(), "high priority")
-        self.assertEqual(len(pq), 3)
+        self.assertEqual(self.pq.minimum(), "high priority")
+        self.assertEqual(len(self.pq), 3)
 
     def test_is_empty(self):
         pq = PriorityQueue()
@@ -74,12 +194,70 @@ class TestPriorityQueue(unittest.TestCase):
         self.assertFalse(pq.is_empty())
 
     def test_decrease_key(self):
+        self.pq.decrease_key("low priority", 0)
+        self.assertEqual(self.pq.minimum(), "low priority")
+
+    def test_decrease_key_stays_in_fast_mode(self):
         pq = PriorityQueue()
+        self.assertTrue(pq.fast_mode)
         pq.insert(3, "low priority")
         pq.insert(2, "medium priority")
-        pq.insert(1, "high priority")
         pq.decrease_key("low priority", 0)
-        self.assertEqual(pq.minimum(), "low priority")
+        self.assertTrue(pq.fast_mode)
+        self.assertEqual(len(pq), 2)
+        pq.insert(1, "high priority")
+        self.assertEqual(pq.extract_minimum(), "low priority")
+        self.assertEqual(pq.extract_minimum(), "high priority")
+        self.assertEqual(pq.minimum(), "medium priority")
+        self.assertEqual(pq.extract_minimum(), "medium priority")
+        self.assertTrue(pq.is_empty())
+
+        pq.insert(5, "a")
+        with self.assertRaises(ValueError):
+            pq.decrease_key("a", 6)
+
+    def test_decrease_key_keeps_order(self):
+        for fast_mode in [True, False]:
+            with self.subTest(fast_mode=fast_mode):
+                pq = PriorityQueue(fast_mode)
+                keys = [(key * 37) % 101 for key in range(101)]
+                for key in keys:
+                    pq.insert(key, key)
+                pq.decrease_key(100, -1)
+                pq.decrease_key(100, -2)
+                self.assertEqual([pq.extract_minimum() for _ in keys],
+                    [100] + [key for key in sorted(keys) if key != 100])
+
+    def test_extract_until_empty(self):
+        for fast_mode in [True, False]:
+            with self.subTest(fast_mode=fast_mode):
+                pq = PriorityQueue(fast_mode)
+                keys = [5, 1, 4, 2, 3, 0]
+                for key in keys:
+                    pq.insert(key, str(key))
+                self.assertEqual([pq.extract_minimum() for _ in keys],
+                    [str(key) for key in sorted(keys)])
+                self.assertTrue(pq.is_empty())
+                # extracted values can be inserted again
+                pq.insert(1, "1")
+                self.assertEqual(pq.extract_minimum(), "1")
+
+    def test_decrease_key_after_extract(self):
+        for fast_mode in [True, False]:
+            with self.subTest(fast_mode=fast_mode):
+                pq = PriorityQueue(fast_mode)
+                for key in range(20):
+                    pq.insert(key, key)
+                for _ in range(5):
+                    pq.extract_minimum()
+                # the positions of the remaining values moved, their index is still right
+                pq.decrease_key(19, 0)
+                pq.decrease_key(12, 1)
+                self.assertEqual(pq.extract_minimum(), 19)
+                self.assertEqual(pq.extract_minimum(), 12)
+                self.assertEqual(pq.extract_minimum(), 5)
+                with self.assertRaises(ValueError):
+                    pq.decrease_key(0, -1)
 
     def test_extract_minimum_empty_queue(self):
         pq = PriorityQueue()
@@ -97,9 +275,6 @@ class TestPriorityQueue(unittest.TestCase):
         with self.assertRaises(ValueError):
             pq.insert(2, "high priority")
 
-import unittest
-from data_structures import FibonacciHeap
-
 class TestFibonacciHeap(unittest.TestCase):
 
     def test_insert(self):
@@ -155,5 +330,456 @@ class TestFibonacciHeap(unittest.TestCase):
         with self.assertRaises(ValueError):
             heap.insert(10, "high priority")
 
+class TestBinomialHeap(unittest.TestCase):
+
+    def test_insert(self):
+        heap = BinomialHeap()
+        for key in range(7):
+            heap.insert(key, str(key))
+        self.assertEqual(len(heap), 7)
+        self.assertFalse(heap.is_empty())
+
+    def test_value_already_exists(self):
+        heap = BinomialHeap()
+        heap.insert(5, "high priority")
+
+        with self.assertRaises(ValueError):
+            heap.insert(10, "high priority")
+
+    def test_minimum(self):
+        heap = BinomialHeap()
+        with self.assertRaises(IndexError):
+            heap.minimum()
+        for key in [5, 3, 8, 3, 1]:
+            heap.insert(key, len(heap))
+        self.assertEqual(heap.minimum(), 4)
+        heap.decrease_key(2, 0)
+        self.assertEqual(heap.minimum(), 2)
+        self.assertEqual(heap.extract_min(), 2)
+        self.assertEqual(heap.minimum(), 4)
+        self.assertEqual(len(heap), 4)
+
+    def test_extract_min(self):
+        heap = BinomialHeap()
+        keys = [5, 1, 4, 2, 3, 0, 6]
+        for key in keys:
+            heap.insert(key, str(key))
+        self.assertEqual([heap.extract_min() for _ in keys],
+            [str(key) for key in sorted(keys)])
+        self.assertTrue(heap.is_empty())
+
+        with self.assertRaises(IndexError):
+            heap.extract_min()
+
+    def test_extracted_nodes_are_reused(self):
+        heap = BinomialHeap()
+        heap.insert(1, "a")
+        node = heap._value_pointer["a"]
+        heap.extract_min()
+        heap.insert(2, "b")
+        self.assertIs(heap._value_pointer["b"], node)
+        self.assertEqual(heap.extract_min(), "b")
+
+    def test_pool_is_bounded(self):
+        heap = BinomialHeap()
+        count = BinomialHeap._POOL_LIMIT + 100
+        for key in range(count):
+            heap.insert(key, str(key))
+        for key in range(count):
+            self.assertEqual(heap.extract_min(), str(key))
+        self.assertEqual(len(heap._pool), BinomialHeap._POOL_LIMIT)
+
+    def test_nodes_have_slots(self):
+        heap = BinomialHeap()
+        heap.insert(1, "a")
+        self.assertFalse(hasattr(heap._value_pointer["a"], "__dict__"))
+
+    def test_add(self):
+        a = BinomialHeap()
+        b = BinomialHeap()
+        for key in [5, 1, 4]:
+            a.insert(key, str(key))
+        for key in [2, 3, 0, 6]:
+            b.insert(key, str(key))
+        heap = a + b
+        self.assertEqual(len(heap), 7)
+        heap.decrease_key("6", -1)
+        self.assertEqual([heap.extract_min() for _ in range(7)],
+            ["6"] + [str(key) for key in range(6)])
+
+        # both operands still hold their own contents
+        self.assertEqual(len(a), 3)
+        self.assertEqual(len(b), 4)
+        self.assertEqual([a.extract_min() for _ in range(3)], ["1", "4", "5"])
+        self.assertEqual([b.extract_min() for _ in range(4)], ["0", "2", "3", "6"])
+
+        with self.assertRaises(TypeError):
+            heap + 5
+
+    def test_merge_inplace(self):
+        a = BinomialHeap()
+        b = BinomialHeap()
+        a.insert(3, "a")
+        b.insert(1, "b")
+        b.insert(2, "c")
+        a.merge_inplace(b)
+        self.assertEqual(len(a), 3)
+        self.assertTrue(b.is_empty())
+        self.assertEqual(a.minimum(), "b")
+
+        b.insert(0, "a")
+        with self.assertRaises(ValueError):
+            a.merge_inplace(b)
+        with self.assertRaises(ValueError):
+            a + b
+
+class TestRedBlackTree(unittest.TestCase):
+
+    def test_morris_inorder(self):
+        tree = RedBlackTree()
+        keys = [5, 3, 8, 1, 4, 7, 9, 2, 6]
+        for key in keys:
+            tree.insert(key, None)
+        self.assertEqual(list(tree.morris_inorder()), sorted(keys))
+        # stopping a traversal early leaves the tree untouched
+        next(tree.morris_inorder())
+        self.assertEqual(list(tree.morris_inorder()), sorted(keys))
+        self.assertEqual(list(RedBlackTree().morris_inorder()), [])
+
+    def test_morris_inorder_print(self):
+        tree = RedBlackTree()
+        for key in [5, 3, 8, 1, 4]:
+            tree.insert(key, None)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            tree.morris_inorder_print()
+        self.assertEqual(output.getvalue(), "1 3 4 5 8\n")
+
+    def test_items(self):
+        tree = RedBlackTree()
+        for key in [5, 3, 8, 1, 4]:
+            tree.insert(key, str(key))
+        self.assertEqual(list(tree.items()),
+            [(key, str(key)) for key in [1, 3, 4, 5, 8]])
+        self.assertEqual(list(RedBlackTree().items()), [])
+
+    def test_successor_and_predecessor(self):
+        tree = RedBlackTree()
+        keys = [5, 3, 8, 1, 4, 7, 9, 2, 6]
+        for key in keys:
+            tree.insert(key, None)
+        ordered = sorted(keys)
+        for before, after in zip(ordered, ordered[1:]):
+            self.assertIs(tree.search(before)._successor(), tree.search(after))
+            self.assertIs(tree.search(after)._predecessor(), tree.search(before))
+        self.assertIsNone(tree.search(9)._successor())
+        self.assertIsNone(tree.search(1)._predecessor())
+
+    def test_walk_from_first_and_last(self):
+        tree = RedBlackTree()
+        for key in range(50):
+            tree.insert(key, None)
+        for key in range(0, 50, 3):
+            tree.delete(key)
+        expected = [key for key in range(50) if key % 3]
+
+        forward = []
+        node = tree.first()
+        while node is not None:
+            forward.append(node.key)
+            node = node._successor()
+        self.assertEqual(forward, expected)
+
+        backward = []
+        node = tree.last()
+        while node is not None:
+            backward.append(node.key)
+            node = node._predecessor()
+        self.assertEqual(backward, expected[::-1])
+
+    def test_nodes_have_slots(self):
+        tree = RedBlackTree()
+        tree.insert(1, None)
+        self.assertFalse(hasattr(tree.search(1), "__dict__"))
+        self.assertFalse(hasattr(tree.root, "__dict__"))
+
+    def test_first_and_last(self):
+        tree = RedBlackTree()
+        self.assertIsNone(tree.first())
+        self.assertIsNone(tree.last())
+        keys = [5, 3, 8, 1, 4, 7, 9, 2, 6]
+        for key in keys:
+            tree.insert(key, str(key))
+        self.assertEqual(tree.first().value, "1")
+        self.assertEqual(tree.last().value, "9")
+        for key in [1, 9, 5, 2, 8]:
+            tree.delete(key)
+        self.assertEqual((tree.first().key, tree.last().key), (3, 7))
+        tree.bulk_insert([(0, "0"), (10, "10")])
+        self.assertEqual((tree.first().key, tree.last().key), (0, 10))
+        for key in [0, 3, 4, 6, 7, 10]:
+            tree.delete(key)
+        self.assertIsNone(tree.first())
+        self.assertIsNone(tree.last())
+
+    def test_leaves_are_shared_nil(self):
+        tree = RedBlackTree()
+        for key in [2, 1, 3]:
+            tree.insert(key, None)
+        tree.delete(1)
+        node = tree.search(2)
+        self.assertIs(node.left, RedBlackTree.NIL)
+        self.assertIs(tree.search(3).right, RedBlackTree.NIL)
+        self.assertTrue(RedBlackTree.NIL.black)
+
+    def test_delete(self):
+        tree = RedBlackTree()
+        keys = list(range(50))
+        for key in keys:
+            tree.insert(key, None)
+        for key in range(0, 50, 3):
+            tree.delete(key)
+        self.assertEqual(list(tree.morris_inorder()),
+            [key for key in keys if key % 3])
+
+    def test_deleted_nodes_are_reused(self):
+        tree = RedBlackTree()
+        for key in range(10):
+            tree.insert(key, None)
+        tree.delete(9)
+        self.assertEqual(len(tree._pool), 1)
+        tree.insert(20, "20")
+        self.assertEqual(len(tree._pool), 0)
+        self.assertEqual(tree.search(20).value, "20")
+        self.assertEqual(list(tree.morris_inorder()), list(range(9)) + [20])
+
+        # the pool never holds more than its limit
+        count = RedBlackTree._POOL_LIMIT + 100
+        for key in range(100, 100 + count):
+            tree.insert(key, None)
+        for key in range(100, 100 + count):
+            tree.delete(key)
+        self.assertEqual(len(tree._pool), RedBlackTree._POOL_LIMIT)
+        self.assertTrue(tree.check_redblack_property())
+
+    def test_key_type(self):
+        tree = RedBlackTree(key_type=int)
+        tree.insert(1, "one")
+        self.assertEqual(tree.search(1).value, "one")
+
+        with self.assertRaises(TypeError):
+            tree.insert(2.0, "two")
+        with self.assertRaises(TypeError):
+            tree.insert(True, "true")
+
+    def test_check_redblack_property(self):
+        tree = RedBlackTree()
+        self.assertTrue(tree.check_redblack_property())
+        for key in range(100):
+            tree.insert(key, None)
+        for key in range(0, 100, 7):
+            tree.delete(key)
+        self.assertTrue(tree.check_redblack_property())
+
+        with redirect_stdout(io.StringIO()):
+            node = tree.search(50)
+            node.key = 0
+            self.assertFalse(tree.check_redblack_property())
+            node.key = 50
+            self.assertTrue(tree.check_redblack_property())
+            child = tree.root.left
+            child.parent = None
+            self.assertFalse(tree.check_redblack_property())
+            child.parent = tree.root
+            self.assertTrue(tree.check_redblack_property())
+            tree.root.black = False
+            self.assertFalse(tree.check_redblack_property())
+
+    def test_random_inserts_and_deletes(self):
+        generator = random.Random(0)
+        tree = RedBlackTree()
+        keys = set()
+        for _ in range(500):
+            key = generator.randrange(200)
+            if key in keys:
+                tree.delete(key)
+                keys.remove(key)
+            else:
+                tree.insert(key, None)
+                keys.add(key)
+            self.assertTrue(tree.check_redblack_property())
+        self.assertEqual(list(tree.morris_inorder()), sorted(keys))
+
+    def test_bulk_insert(self):
+        for count in [0, 1, 2, 3, 7, 8, 100]:
+            with self.subTest(count=count):
+                tree = RedBlackTree()
+                tree.bulk_insert((key, str(key)) for key in reversed(range(count)))
+                self.assertTrue(tree.check_redblack_property())
+                self.assertEqual(list(tree.morris_inorder()), list(range(count)))
+
+        tree = RedBlackTree()
+        for key in range(0, 20, 2):
+            tree.insert(key, "old")
+        tree.bulk_insert([(5, "new"), (4, "new"), (25, "new")])
+        self.assertTrue(tree.check_redblack_property())
+        self.assertEqual(list(tree.morris_inorder()),
+            sorted(list(range(0, 20, 2)) + [5, 25]))
+        self.assertEqual(tree.search(4).value, "new")
+        self.assertEqual(tree.search(6).value, "old")
+        tree.insert(3, None)
+        tree.delete(10)
+        self.assertTrue(tree.check_redblack_property())
+
+    def test_from_sorted(self):
+        for count in [0, 1, 2, 3, 7, 8, 100]:
+            with self.subTest(count=count):
+                tree = RedBlackTree.from_sorted(range(count), map(str, range(count)))
+                self.assertTrue(tree.check_redblack_property())
+                self.assertEqual(list(tree.items()),
+                    [(key, str(key)) for key in range(count)])
+        tree.delete(50)
+        tree.insert(100, None)
+        self.assertTrue(tree.check_redblack_property())
+        self.assertEqual((tree.first().key, tree.last().key), (0, 100))
+
+        with self.assertRaises(ValueError):
+            RedBlackTree.from_sorted([1, 3, 2], [None] * 3)
+        with self.assertRaises(ValueError):
+            RedBlackTree.from_sorted([1, 1], [None] * 2)
+        with self.assertRaises(ValueError):
+            RedBlackTree.from_sorted([1, 2], [None])
+        with self.assertRaises(TypeError):
+            RedBlackTree.from_sorted([1, 2.0], [None] * 2, key_type=int)
+
+    def test_relayout_veb(self):
+        tree = RedBlackTree()
+        keys = [(key * 37) % 101 for key in range(101)]
+        for key in keys:
+            tree.insert(key, str(key))
+        old_root = tree.root
+        tree.relayout_veb()
+        self.assertIsNot(tree.root, old_root)
+        self.assertTrue(tree.check_redblack_property())
+        self.assertEqual(list(tree.items()),
+            [(key, str(key)) for key in range(101)])
+        self.assertEqual((tree.first().key, tree.last().key), (0, 100))
+        tree.delete(0)
+        tree.insert(101, None)
+        self.assertTrue(tree.check_redblack_property())
+        RedBlackTree().relayout_veb()
+
+class TestRedBlackTreeStore(unittest.TestCase):
+
+    def test_search(self):
+        tree = RedBlackTree()
+        for key in [5, 3, 8, 1, 4, 7, 9]:
+            tree.insert(key, str(key))
+        store = RedBlackTreeStore(tree)
+        self.assertEqual(len(store), 7)
+        for key in [5, 3, 8, 1, 4, 7, 9]:
+            self.assertEqual(store.values[store.search(key)], str(key))
+        self.assertEqual(store.search(6), 0)
+
+    def test_successor_and_predecessor(self):
+        tree = RedBlackTree()
+        keys = [5, 3, 8, 1, 4, 7, 9]
+        for key in keys:
+            tree.insert(key, None)
+        store = RedBlackTreeStore(tree)
+        ordered = sorted(keys)
+        for before, after in zip(ordered, ordered[1:]):
+            self.assertEqual(store.successor(store.search(before)),
+                store.search(after))
+            self.assertEqual(store.predecessor(store.search(after)),
+                store.search(before))
+        self.assertEqual(store.successor(store.search(9)), 0)
+        self.assertEqual(store.predecessor(store.search(1)), 0)
+
+    def test_freeze(self):
+        tree = RedBlackTree()
+        for key in range(100):
+            tree.insert(key, str(key))
+        store = tree.freeze()
+        self.assertIs(tree.freeze(), store)
+        self.assertEqual(len(store), 100)
+        for key in range(100):
+            self.assertEqual(store.values[store.search(key)], str(key))
+            self.assertEqual(store.keys[store.successor(store.search(key))],
+                key + 1 if key < 99 else None)
+        tree.insert(100, "100")
+        self.assertIsNot(tree.freeze(), store)
+
+    def test_empty_tree(self):
+        store = RedBlackTreeStore(RedBlackTree())
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.search(1), 0)
+
+class TestBTree(unittest.TestCase):
+
+    def test_insert_and_search(self):
+        tree = BTree(2)
+        for key in range(100):
+            tree.insert(key, str(key))
+        self.assertEqual(len(tree), 100)
+        for key in range(100):
+            node, index = tree.search(key)
+            self.assertEqual(node.values[index], str(key))
+        self.assertIsNone(tree.search(100))
+
+    def test_insert_existing_key(self):
+        tree = BTree(2)
+        tree.insert(1, "old")
+        tree.insert(1, "new")
+        node, index = tree.search(1)
+        self.assertEqual(node.values[index], "new")
+        self.assertEqual(len(tree), 1)
+
+    def test_delete(self):
+        tree = BTree(2)
+        for key in range(100):
+            tree.insert(key, None)
+        for key in range(0, 100, 3):
+            tree.delete(key)
+        for key in range(100):
+            self.assertEqual(tree.search(key) is None, key % 3 == 0)
+        self.assertEqual(len(tree), 66)
+        self.assertEqual(list(tree.inorder()),
+            [key for key in range(100) if key % 3])
+
+    def test_random_inserts_and_deletes(self):
+        for t in [2, 16]:
+            with self.subTest(t=t):
+                generator = random.Random(0)
+                tree = BTree(t)
+                keys = set()
+                for _ in range(1000):
+                    key = generator.randrange(300)
+                    if key in keys:
+                        tree.delete(key)
+                        keys.remove(key)
+                    else:
+                        tree.insert(key, None)
+                        keys.add(key)
+                    self.assertTrue(tree.check_btree_property())
+                self.assertEqual(list(tree.inorder()), sorted(keys))
+                self.assertEqual(len(tree), len(keys))
+
+    def test_check_btree_property(self):
+        tree = BTree(2)
+        self.assertTrue(tree.check_btree_property())
+        for key in range(20):
+            tree.insert(key, None)
+        leaf = tree.root
+        while not leaf.leaf:
+            leaf = leaf.children[0]
+        with redirect_stdout(io.StringIO()):
+            leaf.keys[0] = 100
+            self.assertFalse(tree.check_btree_property())
+            leaf.keys[0] = 0
+            self.assertTrue(tree.check_btree_property())
+            leaf.values.pop()
+            self.assertFalse(tree.check_btree_property())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file